@@ -0,0 +1,91 @@
+# Copyright The PyTorch Lightning team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pytest
+import torch
+
+import pytorch_lightning.trainer.connectors.accelerator_connector as accelerator_connector
+from pytorch_lightning.accelerators.mps import MPSAccelerator
+
+
+@pytest.fixture(scope="function", autouse=True)
+def cache_cuda_device_queries(monkeypatch):
+    """Caches ``torch.cuda.device_count`` and ``torch.cuda.is_available`` for the duration of a test.
+
+    The accelerator connector queries these many times per ``Trainer`` construction. Tests that mock them with
+    ``mock.patch`` replace the cached functions entirely, and the cache is dropped at the end of each test.
+    """
+    device_count = lru_cache(1)(torch.cuda.device_count)
+    is_available = lru_cache(1)(torch.cuda.is_available)
+    monkeypatch.setattr(torch.cuda, "device_count", device_count)
+    monkeypatch.setattr(torch.cuda, "is_available", is_available)
+    yield
+    device_count.cache_clear()
+    is_available.cache_clear()
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """The devices that the accelerator connector gets to see in a test."""
+
+    cuda_count: int = 0
+    # only consulted when the accelerator is chosen automatically, so it may disagree with ``cuda_count``
+    cuda_available: bool = False
+    mps: bool = False
+    tpu: bool = False
+    ipu: bool = False
+    hpu: bool = False
+
+
+def fake_devices(monkeypatch, capabilities: DeviceCapabilities) -> None:
+    """Replaces all the device probes of the accelerator connector at once."""
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: capabilities.cuda_count)
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: capabilities.cuda_available)
+    if capabilities.cuda_count:
+        monkeypatch.setattr(torch.cuda, "set_device", lambda _: None)
+    monkeypatch.setattr(MPSAccelerator, "is_available", staticmethod(lambda: capabilities.mps))
+    monkeypatch.setattr(accelerator_connector, "_TPU_AVAILABLE", capabilities.tpu)
+    monkeypatch.setattr(accelerator_connector, "_IPU_AVAILABLE", capabilities.ipu)
+    monkeypatch.setattr(accelerator_connector, "_HPU_AVAILABLE", capabilities.hpu)
+
+
+@pytest.fixture
+def device_capabilities(monkeypatch, request):
+    """Fakes the devices given by an indirect parametrization with the arguments of :class:`DeviceCapabilities`.
+
+    By default only a CPU is available.
+    """
+    capabilities = DeviceCapabilities(**getattr(request, "param", {}))
+    fake_devices(monkeypatch, capabilities)
+    return capabilities
+
+
+@pytest.fixture
+def cuda_count_0(monkeypatch):
+    """Only a CPU is available."""
+    fake_devices(monkeypatch, DeviceCapabilities())
+
+
+@pytest.fixture
+def cuda_count_2(monkeypatch):
+    """Two CUDA devices that are not picked by ``accelerator="auto"``."""
+    fake_devices(monkeypatch, DeviceCapabilities(cuda_count=2))
+
+
+@pytest.fixture
+def fake_cuda(monkeypatch):
+    """Pretends that CUDA is available with two devices."""
+    fake_devices(monkeypatch, DeviceCapabilities(cuda_count=2, cuda_available=True))
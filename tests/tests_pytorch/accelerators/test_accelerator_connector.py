@@ -13,14 +13,16 @@
 # limitations under the License
 
 import os
+import re
 from unittest import mock
-from unittest.mock import Mock
 
 import pytest
 import torch
 import torch.distributed
 
 import pytorch_lightning
+import pytorch_lightning.strategies.ipu as ipu
+import pytorch_lightning.utilities.imports as imports
 from pytorch_lightning import Trainer
 from pytorch_lightning.accelerators.accelerator import Accelerator
 from pytorch_lightning.accelerators.cpu import CPUAccelerator
@@ -47,11 +49,77 @@ from pytorch_lightning.strategies import (
 from pytorch_lightning.utilities.exceptions import MisconfigurationException
 from tests_pytorch.helpers.runif import RunIf
 
-
-def test_accelerator_choice_cpu(tmpdir):
-    trainer = Trainer(default_root_dir=tmpdir, fast_dev_run=True)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, SingleDeviceStrategy)
+_RE_DDP_NOT_INTERACTIVE_COMPATIBLE = re.compile(r"strategy='ddp'\)`.*is not compatible")
+_RE_CUDA_NOT_AVAILABLE = re.compile(
+    r"CUDAAccelerator can not run on your system since the accelerator is not available\."
+)
+_RE_DEPRECATED_IN_V1_7 = re.compile(r"is deprecated in v1.7 and will be removed")
+_RE_INVALID_DEVICES_TYPE = re.compile(r"must be an int, a string, a sequence of ints or None, but you")
+_RE_TPU_STRATEGY_REQUIRED = re.compile(r"TPUAccelerator` can only be used with a `SingleTPUStrategy`")
+_RE_PARALLEL_DEVICES_CONFLICT = re.compile(r"parallel_devices set through")
+_RE_INVALID_DEVICES_INPUT = re.compile(r"value is not a valid input using")
+
+_SLURM_ENV = {
+    "SLURM_NTASKS": "2",
+    "SLURM_JOB_NAME": "SOME_NAME",
+    "SLURM_NODEID": "0",
+    "LOCAL_RANK": "0",
+    "SLURM_PROCID": "0",
+    "SLURM_LOCALID": "0",
+}
+_SLURM_GPU_ENV = {
+    "CUDA_VISIBLE_DEVICES": "0,1",
+    "SLURM_NTASKS": "2",
+    "SLURM_JOB_NAME": "SOME_NAME",
+    "SLURM_NODEID": "0",
+    "SLURM_PROCID": "1",
+    "SLURM_LOCALID": "1",
+}
+_TORCHELASTIC_ENV = {
+    "WORLD_SIZE": "2",
+    "LOCAL_WORLD_SIZE": "2",
+    "RANK": "1",
+    "LOCAL_RANK": "1",
+    "GROUP_RANK": "0",
+    "TORCHELASTIC_RUN_ID": "1",
+}
+_KUBEFLOW_ENV = {
+    "KUBERNETES_PORT": "tcp://127.0.0.1:443",
+    "MASTER_ADDR": "1.2.3.4",
+    "MASTER_PORT": "500",
+    "WORLD_SIZE": "20",
+    "RANK": "1",
+}
+
+
+def _set_env(monkeypatch, env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+
+def _is_exact_type(obj, cls) -> bool:
+    # the module-level test classes have no subclasses, so an identity check is enough
+    return type(obj) is cls
+
+
+def _assert_trainer(trainer, **expected) -> None:
+    for name, cls in expected.items():
+        assert isinstance(getattr(trainer, name), cls), (name, cls)
+
+
+@pytest.fixture
+def env_vars(monkeypatch, request):
+    _set_env(monkeypatch, request.param)
+
+
+@pytest.fixture
+def slurm_env(monkeypatch):
+    _set_env(monkeypatch, _SLURM_ENV)
+
+
+def test_accelerator_choice_cpu():
+    trainer = Trainer(fast_dev_run=True)
+    _assert_trainer(trainer, accelerator=CPUAccelerator, strategy=SingleDeviceStrategy)
 
 
 def test_accelerator_invalid_choice():
@@ -60,166 +128,132 @@ def test_accelerator_invalid_choice():
 
 
 @RunIf(skip_windows=True, standalone=True)
-def test_strategy_choice_ddp_on_cpu(tmpdir):
+def test_strategy_choice_ddp_on_cpu():
     """Test that selecting DDPStrategy on CPU works."""
-    _test_strategy_choice_ddp_and_cpu(tmpdir, ddp_strategy_class=DDPStrategy)
+    _test_strategy_choice_ddp_and_cpu(ddp_strategy_class=DDPStrategy)
 
 
 @RunIf(skip_windows=True)
-def test_strategy_choice_ddp_spawn_on_cpu(tmpdir):
+def test_strategy_choice_ddp_spawn_on_cpu():
     """Test that selecting DDPSpawnStrategy on CPU works."""
-    _test_strategy_choice_ddp_and_cpu(tmpdir, ddp_strategy_class=DDPSpawnStrategy)
+    _test_strategy_choice_ddp_and_cpu(ddp_strategy_class=DDPSpawnStrategy)
 
 
-def _test_strategy_choice_ddp_and_cpu(tmpdir, ddp_strategy_class):
+def _test_strategy_choice_ddp_and_cpu(ddp_strategy_class):
     trainer = Trainer(
-        default_root_dir=tmpdir,
         fast_dev_run=True,
         strategy=ddp_strategy_class(find_unused_parameters=True),
         accelerator="cpu",
         devices=2,
     )
-    assert isinstance(trainer.strategy, ddp_strategy_class)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
+    _assert_trainer(trainer, strategy=ddp_strategy_class, accelerator=CPUAccelerator)
     assert trainer.strategy.num_processes == 2
     assert trainer.strategy.parallel_devices == [torch.device("cpu")] * 2
 
 
-@mock.patch.dict(
-    os.environ,
-    {
-        "SLURM_NTASKS": "2",
-        "SLURM_JOB_NAME": "SOME_NAME",
-        "SLURM_NODEID": "0",
-        "LOCAL_RANK": "0",
-        "SLURM_PROCID": "0",
-        "SLURM_LOCALID": "0",
-    },
-)
-@mock.patch("torch.cuda.device_count", return_value=0)
-def test_custom_cluster_environment_in_slurm_environment(_, tmpdir):
-    """Test that we choose the custom cluster even when SLURM or TE flags are around."""
+class CustomCluster(LightningEnvironment):
+    @property
+    def main_address(self):
+        return "asdf"
 
-    class CustomCluster(LightningEnvironment):
-        @property
-        def main_address(self):
-            return "asdf"
+    @property
+    def creates_processes_externally(self) -> bool:
+        return True
 
-        @property
-        def creates_processes_externally(self) -> bool:
-            return True
 
+def test_custom_cluster_environment_in_slurm_environment(cuda_count_0, slurm_env):
+    """Test that we choose the custom cluster even when SLURM or TE flags are around."""
     trainer = Trainer(
-        default_root_dir=tmpdir,
         plugins=[CustomCluster()],
         fast_dev_run=True,
         accelerator="cpu",
         strategy="ddp",
         devices=2,
     )
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, CustomCluster)
-
-
-@mock.patch.dict(
-    os.environ,
-    {
-        "SLURM_NTASKS": "2",
-        "SLURM_JOB_NAME": "SOME_NAME",
-        "SLURM_NODEID": "0",
-        "LOCAL_RANK": "0",
-        "SLURM_PROCID": "0",
-        "SLURM_LOCALID": "0",
-    },
-)
-@mock.patch("torch.cuda.device_count", return_value=0)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-def test_custom_accelerator(device_count_mock, setup_distributed_mock):
-    class Accel(Accelerator):
-        @staticmethod
-        def parse_devices(devices):
-            return devices
+    _assert_trainer(trainer, accelerator=CPUAccelerator, strategy=DDPStrategy)
+    assert _is_exact_type(trainer.strategy.cluster_environment, CustomCluster)
+
+
+class CustomAccelerator(Accelerator):
+    @staticmethod
+    def parse_devices(devices):
+        return devices
+
+    @staticmethod
+    def get_parallel_devices(devices):
+        return [torch.device("cpu")] * devices
+
+    @staticmethod
+    def auto_device_count() -> int:
+        return 1
+
+    @staticmethod
+    def is_available() -> bool:
+        return True
+
+    @staticmethod
+    def name() -> str:
+        return "custom_acc_name"
 
-        @staticmethod
-        def get_parallel_devices(devices):
-            return [torch.device("cpu")] * devices
 
-        @staticmethod
-        def auto_device_count() -> int:
-            return 1
+class CustomPrecisionPlugin(PrecisionPlugin):
+    pass
 
-        @staticmethod
-        def is_available() -> bool:
-            return True
 
-        @staticmethod
-        def name() -> str:
-            return "custom_acc_name"
+class CustomSingleDeviceStrategy(SingleDeviceStrategy):
+    pass
 
-    class Prec(PrecisionPlugin):
-        pass
 
-    class Strat(SingleDeviceStrategy):
-        pass
+class CustomDDPStrategy(DDPStrategy):
+    pass
 
-    strategy = Strat(device=torch.device("cpu"), accelerator=Accel(), precision_plugin=Prec())
+
+@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
+def test_custom_accelerator(setup_distributed_mock, cuda_count_0, slurm_env):
+    strategy = CustomSingleDeviceStrategy(
+        device=torch.device("cpu"), accelerator=CustomAccelerator(), precision_plugin=CustomPrecisionPlugin()
+    )
     trainer = Trainer(strategy=strategy, fast_dev_run=True, devices=2)
-    assert isinstance(trainer.accelerator, Accel)
-    assert isinstance(trainer.strategy, Strat)
-    assert isinstance(trainer.precision_plugin, Prec)
+    assert _is_exact_type(trainer.accelerator, CustomAccelerator)
+    assert _is_exact_type(trainer.strategy, CustomSingleDeviceStrategy)
+    assert _is_exact_type(trainer.precision_plugin, CustomPrecisionPlugin)
     assert trainer._accelerator_connector.strategy is strategy
 
-    class Strat(DDPStrategy):
-        pass
-
-    strategy = Strat(accelerator=Accel(), precision_plugin=Prec())
+    strategy = CustomDDPStrategy(accelerator=CustomAccelerator(), precision_plugin=CustomPrecisionPlugin())
     trainer = Trainer(strategy=strategy, fast_dev_run=True, devices=2)
-    assert isinstance(trainer.accelerator, Accel)
-    assert isinstance(trainer.strategy, Strat)
-    assert isinstance(trainer.precision_plugin, Prec)
+    assert _is_exact_type(trainer.accelerator, CustomAccelerator)
+    assert _is_exact_type(trainer.strategy, CustomDDPStrategy)
+    assert _is_exact_type(trainer.precision_plugin, CustomPrecisionPlugin)
     assert trainer._accelerator_connector.strategy is strategy
 
 
-@mock.patch.dict(
-    os.environ,
-    {
-        "SLURM_NTASKS": "2",
-        "SLURM_JOB_NAME": "SOME_NAME",
-        "SLURM_NODEID": "0",
-        "LOCAL_RANK": "0",
-        "SLURM_PROCID": "0",
-        "SLURM_LOCALID": "0",
-    },
-)
-@mock.patch("torch.cuda.device_count", return_value=0)
 @mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-def test_dist_backend_accelerator_mapping(*_):
+def test_dist_backend_accelerator_mapping(_, cuda_count_0, slurm_env):
     trainer = Trainer(fast_dev_run=True, strategy="ddp_spawn", accelerator="cpu", devices=2)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
+    _assert_trainer(trainer, accelerator=CPUAccelerator, strategy=DDPStrategy)
     assert trainer.strategy.local_rank == 0
 
 
-@mock.patch("torch.cuda.device_count", return_value=2)
-def test_ipython_incompatible_backend_error(_, monkeypatch):
-    monkeypatch.setattr(pytorch_lightning.utilities, "_IS_INTERACTIVE", True)
-    with pytest.raises(MisconfigurationException, match=r"strategy='ddp'\)`.*is not compatible"):
-        Trainer(strategy="ddp", accelerator="gpu", devices=2)
-
-    with pytest.raises(MisconfigurationException, match=r"strategy='ddp_spawn'\)`.*is not compatible"):
-        Trainer(strategy="ddp_spawn", accelerator="gpu", devices=2)
-
-    with pytest.raises(MisconfigurationException, match=r"strategy='ddp_sharded_spawn'\)`.*is not compatible"):
-        Trainer(strategy="ddp_sharded_spawn", accelerator="gpu", devices=2)
-
-    with pytest.raises(MisconfigurationException, match=r"strategy='ddp'\)`.*is not compatible"):
+@pytest.mark.parametrize(
+    ["trainer_kwargs", "match"],
+    [
+        (dict(strategy="ddp", accelerator="gpu", devices=2), _RE_DDP_NOT_INTERACTIVE_COMPATIBLE),
+        (dict(strategy="ddp_spawn", accelerator="gpu", devices=2), r"strategy='ddp_spawn'\)`.*is not compatible"),
+        (
+            dict(strategy="ddp_sharded_spawn", accelerator="gpu", devices=2),
+            r"strategy='ddp_sharded_spawn'\)`.*is not compatible",
+        ),
         # Edge case: AcceleratorConnector maps dp to ddp if accelerator != gpu
-        Trainer(strategy="dp")
+        pytest.param(dict(strategy="dp"), _RE_DDP_NOT_INTERACTIVE_COMPATIBLE, id="dp-mapped-to-ddp"),
+    ],
+)
+def test_ipython_incompatible_backend_error(cuda_count_2, monkeypatch, trainer_kwargs, match):
+    monkeypatch.setattr(pytorch_lightning.utilities, "_IS_INTERACTIVE", True)
+    with pytest.raises(MisconfigurationException, match=match):
+        Trainer(**trainer_kwargs)
 
 
-@mock.patch("torch.cuda.device_count", return_value=2)
-def test_ipython_compatible_dp_strategy_gpu(_, monkeypatch):
+def test_ipython_compatible_dp_strategy_gpu(cuda_count_2, monkeypatch):
     monkeypatch.setattr(pytorch_lightning.utilities, "_IS_INTERACTIVE", True)
     trainer = Trainer(strategy="dp", accelerator="gpu")
     assert trainer.strategy.launcher is None or trainer.strategy.launcher.is_interactive_compatible
@@ -243,44 +277,35 @@ def test_ipython_compatible_strategy_tpu(mock_tpu_acc_avail, monkeypatch):
     ],
 )
 @pytest.mark.parametrize("devices", [1, 2])
-@mock.patch("torch.cuda.is_available", return_value=True)
-@mock.patch("torch.cuda.device_count", return_value=2)
-def test_accelerator_choice_multi_node_gpu(
-    mock_is_available, mock_device_count, tmpdir, strategy, strategy_class, devices
-):
-    trainer = Trainer(default_root_dir=tmpdir, num_nodes=2, accelerator="gpu", strategy=strategy, devices=devices)
+def test_accelerator_choice_multi_node_gpu(fake_cuda, strategy, strategy_class, devices):
+    trainer = Trainer(num_nodes=2, accelerator="gpu", strategy=strategy, devices=devices)
     assert isinstance(trainer.strategy, strategy_class)
 
 
-@mock.patch("torch.cuda.is_available", return_value=False)
-def test_accelerator_cpu(_):
+def test_accelerator_cpu(cuda_count_0):
     trainer = Trainer(accelerator="cpu")
     assert isinstance(trainer.accelerator, CPUAccelerator)
 
     with pytest.raises(
         MisconfigurationException,
-        match="CUDAAccelerator can not run on your system since the accelerator is not available.",
+        match=_RE_CUDA_NOT_AVAILABLE,
     ):
-        with pytest.deprecated_call(match=r"is deprecated in v1.7 and will be removed"):
+        with pytest.deprecated_call(match=_RE_DEPRECATED_IN_V1_7):
             Trainer(gpus=1)
 
     with pytest.raises(
         MisconfigurationException,
-        match="CUDAAccelerator can not run on your system since the accelerator is not available.",
+        match=_RE_CUDA_NOT_AVAILABLE,
     ):
         Trainer(accelerator="gpu")
 
-    with pytest.deprecated_call(match=r"is deprecated in v1.7 and will be removed"):
+    with pytest.deprecated_call(match=_RE_DEPRECATED_IN_V1_7):
         Trainer(accelerator="cpu", gpus=1)
 
 
-@mock.patch("torch.cuda.device_count", return_value=2)
-@mock.patch("torch.cuda.is_available", return_value=True)
 @pytest.mark.parametrize("device_count", (["0"], [0, "1"], ["GPU"], [["0", "1"], [0, 1]], [False]))
-def test_accelererator_invalid_type_devices(mock_is_available, mock_device_count, device_count):
-    with pytest.raises(
-        MisconfigurationException, match=r"must be an int, a string, a sequence of ints or None, but you"
-    ):
+def test_accelererator_invalid_type_devices(fake_cuda, device_count):
+    with pytest.raises(MisconfigurationException, match=_RE_INVALID_DEVICES_TYPE):
         _ = Trainer(accelerator="gpu", devices=device_count)
 
 
@@ -300,8 +325,7 @@ def test_accelerator_gpu():
 def test_accelerator_cpu_with_devices(devices, strategy_class):
     trainer = Trainer(accelerator="cpu", devices=devices)
     assert trainer.num_devices == devices
-    assert isinstance(trainer.strategy, strategy_class)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
+    _assert_trainer(trainer, strategy=strategy_class, accelerator=CPUAccelerator)
 
 
 @RunIf(min_cuda_gpus=2)
@@ -311,8 +335,7 @@ def test_accelerator_cpu_with_devices(devices, strategy_class):
 def test_accelerator_gpu_with_devices(devices, strategy_class):
     trainer = Trainer(accelerator="gpu", devices=devices)
     assert trainer.num_devices == len(devices) if isinstance(devices, list) else devices
-    assert isinstance(trainer.strategy, strategy_class)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
+    _assert_trainer(trainer, strategy=strategy_class, accelerator=CUDAAccelerator)
 
 
 @RunIf(min_cuda_gpus=1)
@@ -341,58 +364,41 @@ def test_exception_invalid_strategy():
 
 
 @pytest.mark.parametrize(
-    ["strategy", "strategy_class"],
-    [
-        ("ddp_spawn", DDPSpawnStrategy),
-        ("ddp_spawn_find_unused_parameters_false", DDPSpawnStrategy),
-        ("ddp", DDPStrategy),
-        ("ddp_find_unused_parameters_false", DDPStrategy),
-    ],
-)
-def test_strategy_choice_cpu_str(strategy, strategy_class):
-    trainer = Trainer(strategy=strategy, accelerator="cpu", devices=2)
-    assert isinstance(trainer.strategy, strategy_class)
-
-
-@pytest.mark.parametrize("strategy_class", [DDPSpawnStrategy, DDPStrategy])
-def test_strategy_choice_cpu_instance(strategy_class):
-    trainer = Trainer(strategy=strategy_class(), accelerator="cpu", devices=2)
-    assert isinstance(trainer.strategy, strategy_class)
-
-
-@RunIf(min_cuda_gpus=2)
-@pytest.mark.parametrize(
-    ["strategy", "strategy_class"],
+    ["strategy", "accelerator", "strategy_class", "accelerator_class"],
     [
-        ("ddp_spawn", DDPSpawnStrategy),
-        ("ddp_spawn_find_unused_parameters_false", DDPSpawnStrategy),
-        ("ddp", DDPStrategy),
-        ("ddp_find_unused_parameters_false", DDPStrategy),
-        ("dp", DataParallelStrategy),
-        ("ddp_sharded", DDPShardedStrategy),
-        ("ddp_sharded_spawn", DDPSpawnShardedStrategy),
-        pytest.param("deepspeed", DeepSpeedStrategy, marks=RunIf(deepspeed=True)),
+        ("ddp_spawn", "cpu", DDPSpawnStrategy, CPUAccelerator),
+        ("ddp_spawn_find_unused_parameters_false", "cpu", DDPSpawnStrategy, CPUAccelerator),
+        ("ddp", "cpu", DDPStrategy, CPUAccelerator),
+        ("ddp_find_unused_parameters_false", "cpu", DDPStrategy, CPUAccelerator),
+        (DDPSpawnStrategy(), "cpu", DDPSpawnStrategy, CPUAccelerator),
+        (DDPStrategy(), "cpu", DDPStrategy, CPUAccelerator),
+        pytest.param("ddp_spawn", "gpu", DDPSpawnStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
+        pytest.param(
+            "ddp_spawn_find_unused_parameters_false",
+            "gpu",
+            DDPSpawnStrategy,
+            CUDAAccelerator,
+            marks=RunIf(min_cuda_gpus=2),
+        ),
+        pytest.param("ddp", "gpu", DDPStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
+        pytest.param(
+            "ddp_find_unused_parameters_false", "gpu", DDPStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)
+        ),
+        pytest.param("dp", "gpu", DataParallelStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
+        pytest.param("ddp_sharded", "gpu", DDPShardedStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
+        pytest.param(
+            "ddp_sharded_spawn", "gpu", DDPSpawnShardedStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)
+        ),
+        pytest.param(
+            "deepspeed", "gpu", DeepSpeedStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2, deepspeed=True)
+        ),
+        pytest.param(DDPSpawnStrategy(), "gpu", DDPSpawnStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
+        pytest.param(DDPStrategy(), "gpu", DDPStrategy, CUDAAccelerator, marks=RunIf(min_cuda_gpus=2)),
     ],
 )
-def test_strategy_choice_gpu_str(strategy, strategy_class):
-    trainer = Trainer(strategy=strategy, accelerator="gpu", devices=2)
-    assert isinstance(trainer.strategy, strategy_class)
-
-
-@RunIf(min_cuda_gpus=2)
-@pytest.mark.parametrize("strategy_class", [DDPSpawnStrategy, DDPStrategy])
-def test_strategy_choice_gpu_instance(strategy_class):
-    trainer = Trainer(strategy=strategy_class(), accelerator="gpu", devices=2)
-    assert isinstance(trainer.strategy, strategy_class)
-
-
-@RunIf(min_cuda_gpus=2)
-@pytest.mark.parametrize("strategy_class", [DDPSpawnStrategy, DDPStrategy])
-def test_device_type_when_strategy_instance_gpu_passed(strategy_class):
-
-    trainer = Trainer(strategy=strategy_class(), accelerator="gpu", devices=2)
-    assert isinstance(trainer.strategy, strategy_class)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
+def test_strategy_choice(strategy, accelerator, strategy_class, accelerator_class):
+    trainer = Trainer(strategy=strategy, accelerator=accelerator, devices=2)
+    _assert_trainer(trainer, strategy=strategy_class, accelerator=accelerator_class)
 
 
 @pytest.mark.parametrize("precision", [1, 12, "invalid"])
@@ -409,169 +415,103 @@ def test_amp_level_raises_error_with_native():
 
 def test_strategy_choice_ddp_spawn_cpu():
     trainer = Trainer(fast_dev_run=True, strategy="ddp_spawn", accelerator="cpu", devices=2)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPSpawnStrategy)
+    _assert_trainer(trainer, accelerator=CPUAccelerator, strategy=DDPSpawnStrategy)
     assert isinstance(trainer.strategy.cluster_environment, LightningEnvironment)
 
 
-@mock.patch.dict(os.environ, {"CUDA_VISIBLE_DEVICES": "0,1"})
-@mock.patch("torch.cuda.device_count", return_value=2)
-@mock.patch("torch.cuda.is_available", return_value=True)
-def test_strategy_choice_ddp(*_):
+def test_strategy_choice_ddp(fake_cuda, monkeypatch):
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "0,1")
     trainer = Trainer(fast_dev_run=True, strategy="ddp", accelerator="gpu", devices=1)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
+    _assert_trainer(trainer, accelerator=CUDAAccelerator, strategy=DDPStrategy)
     assert isinstance(trainer.strategy.cluster_environment, LightningEnvironment)
 
 
-@mock.patch.dict(os.environ, {"CUDA_VISIBLE_DEVICES": "0,1"})
-@mock.patch("torch.cuda.device_count", return_value=2)
-@mock.patch("torch.cuda.is_available", return_value=True)
-def test_strategy_choice_ddp_spawn(cuda_available_mock, device_count_mock):
+def test_strategy_choice_ddp_spawn(fake_cuda, monkeypatch):
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "0,1")
     trainer = Trainer(fast_dev_run=True, strategy="ddp_spawn", accelerator="gpu", devices=1)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
-    assert isinstance(trainer.strategy, DDPSpawnStrategy)
+    _assert_trainer(trainer, accelerator=CUDAAccelerator, strategy=DDPSpawnStrategy)
     assert isinstance(trainer.strategy.cluster_environment, LightningEnvironment)
 
 
-@RunIf(min_cuda_gpus=2)
-@mock.patch.dict(
-    os.environ,
-    {
-        "CUDA_VISIBLE_DEVICES": "0,1",
-        "SLURM_NTASKS": "2",
-        "SLURM_JOB_NAME": "SOME_NAME",
-        "SLURM_NODEID": "0",
-        "SLURM_PROCID": "1",
-        "SLURM_LOCALID": "1",
-    },
-)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-@pytest.mark.parametrize("strategy", ["ddp", DDPStrategy()])
-def test_strategy_choice_ddp_slurm(setup_distributed_mock, strategy):
-    trainer = Trainer(fast_dev_run=True, strategy=strategy, accelerator="gpu", devices=2)
-    assert trainer._accelerator_connector._is_slurm_managing_tasks()
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, SLURMEnvironment)
-    assert trainer.strategy.cluster_environment.local_rank() == 1
-    assert trainer.strategy.local_rank == 1
-
-
-@mock.patch.dict(
-    os.environ,
-    {
-        "CUDA_VISIBLE_DEVICES": "0,1",
-        "WORLD_SIZE": "2",
-        "LOCAL_WORLD_SIZE": "2",
-        "RANK": "1",
-        "LOCAL_RANK": "1",
-        "GROUP_RANK": "0",
-        "TORCHELASTIC_RUN_ID": "1",
-    },
-)
-@mock.patch("torch.cuda.set_device")
-@mock.patch("torch.cuda.device_count", return_value=2)
-@mock.patch("torch.cuda.is_available", return_value=True)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-@mock.patch("torch.cuda.is_available", return_value=True)
-def test_strategy_choice_ddp_te(*_):
-    trainer = Trainer(fast_dev_run=True, strategy="ddp", accelerator="gpu", devices=2)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, TorchElasticEnvironment)
-    assert trainer.strategy.cluster_environment.local_rank() == 1
-    assert trainer.strategy.local_rank == 1
-
-
-@mock.patch.dict(
-    os.environ,
-    {
-        "WORLD_SIZE": "2",
-        "LOCAL_WORLD_SIZE": "2",
-        "RANK": "1",
-        "LOCAL_RANK": "1",
-        "GROUP_RANK": "0",
-        "TORCHELASTIC_RUN_ID": "1",
-    },
-)
-@mock.patch("torch.cuda.device_count", return_value=0)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-def test_strategy_choice_ddp_cpu_te(*_):
-    trainer = Trainer(fast_dev_run=True, strategy="ddp_spawn", accelerator="cpu", devices=2)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, TorchElasticEnvironment)
-    assert trainer.strategy.cluster_environment.local_rank() == 1
-    assert trainer.strategy.local_rank == 1
-
-
-@mock.patch.dict(
-    os.environ,
-    {
-        "CUDA_VISIBLE_DEVICES": "0",
-        "KUBERNETES_PORT": "tcp://127.0.0.1:443",
-        "MASTER_ADDR": "1.2.3.4",
-        "MASTER_PORT": "500",
-        "WORLD_SIZE": "20",
-        "RANK": "1",
-    },
-)
-@mock.patch("torch.cuda.set_device")
-@mock.patch("torch.cuda.device_count", return_value=1)
-@mock.patch("torch.cuda.is_available", return_value=True)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-@mock.patch("torch.cuda.is_available", return_value=True)
-def test_strategy_choice_ddp_kubeflow(*_):
-    trainer = Trainer(fast_dev_run=True, strategy="ddp", accelerator="gpu", devices=1)
-    assert isinstance(trainer.accelerator, CUDAAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, KubeflowEnvironment)
-    assert trainer.strategy.cluster_environment.local_rank() == 0
-    assert trainer.strategy.local_rank == 0
+_ONE_GPU = dict(cuda_count=1, cuda_available=True)
+_TWO_GPUS = dict(cuda_count=2, cuda_available=True)
 
 
-@mock.patch.dict(
-    os.environ,
-    {
-        "KUBERNETES_PORT": "tcp://127.0.0.1:443",
-        "MASTER_ADDR": "1.2.3.4",
-        "MASTER_PORT": "500",
-        "WORLD_SIZE": "20",
-        "RANK": "1",
-    },
-)
-@mock.patch("torch.cuda.device_count", return_value=0)
 @mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-def test_strategy_choice_ddp_cpu_kubeflow(*_):
-    trainer = Trainer(fast_dev_run=True, strategy="ddp_spawn", accelerator="cpu", devices=2)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, KubeflowEnvironment)
-    assert trainer.strategy.cluster_environment.local_rank() == 0
-    assert trainer.strategy.local_rank == 0
-
-
-@mock.patch.dict(
-    os.environ,
-    {
-        "SLURM_NTASKS": "2",
-        "SLURM_JOB_NAME": "SOME_NAME",
-        "SLURM_NODEID": "0",
-        "LOCAL_RANK": "0",
-        "SLURM_PROCID": "0",
-        "SLURM_LOCALID": "0",
-    },
+@pytest.mark.parametrize(
+    [
+        "env_vars",
+        "device_capabilities",
+        "strategy",
+        "accelerator",
+        "devices",
+        "accelerator_class",
+        "cluster_env_class",
+        "local_rank",
+    ],
+    [
+        pytest.param(_SLURM_GPU_ENV, _TWO_GPUS, "ddp", "gpu", 2, CUDAAccelerator, SLURMEnvironment, 1, id="slurm-gpu"),
+        pytest.param(
+            _SLURM_GPU_ENV,
+            _TWO_GPUS,
+            DDPStrategy(),
+            "gpu",
+            2,
+            CUDAAccelerator,
+            SLURMEnvironment,
+            1,
+            id="slurm-gpu-instance",
+        ),
+        pytest.param(_SLURM_ENV, {}, "ddp", "cpu", 2, CPUAccelerator, SLURMEnvironment, 0, id="slurm-cpu"),
+        pytest.param(
+            _SLURM_ENV, {}, DDPStrategy(), "cpu", 2, CPUAccelerator, SLURMEnvironment, 0, id="slurm-cpu-instance"
+        ),
+        pytest.param(
+            {**_TORCHELASTIC_ENV, "CUDA_VISIBLE_DEVICES": "0,1"},
+            _TWO_GPUS,
+            "ddp",
+            "gpu",
+            2,
+            CUDAAccelerator,
+            TorchElasticEnvironment,
+            1,
+            id="te-gpu",
+        ),
+        pytest.param(
+            _TORCHELASTIC_ENV, {}, "ddp_spawn", "cpu", 2, CPUAccelerator, TorchElasticEnvironment, 1, id="te-cpu"
+        ),
+        pytest.param(
+            {**_KUBEFLOW_ENV, "CUDA_VISIBLE_DEVICES": "0"},
+            _ONE_GPU,
+            "ddp",
+            "gpu",
+            1,
+            CUDAAccelerator,
+            KubeflowEnvironment,
+            0,
+            id="kf-gpu",
+        ),
+        pytest.param(_KUBEFLOW_ENV, {}, "ddp_spawn", "cpu", 2, CPUAccelerator, KubeflowEnvironment, 0, id="kf-cpu"),
+    ],
+    indirect=["env_vars", "device_capabilities"],
 )
-@mock.patch("torch.cuda.device_count", return_value=0)
-@mock.patch("pytorch_lightning.strategies.DDPStrategy.setup_distributed", autospec=True)
-@pytest.mark.parametrize("strategy", ["ddp", DDPStrategy()])
-def test_strategy_choice_ddp_cpu_slurm(device_count_mock, setup_distributed_mock, strategy):
-    trainer = Trainer(fast_dev_run=True, strategy=strategy, accelerator="cpu", devices=2)
-    assert isinstance(trainer.accelerator, CPUAccelerator)
-    assert isinstance(trainer.strategy, DDPStrategy)
-    assert isinstance(trainer.strategy.cluster_environment, SLURMEnvironment)
-    assert trainer.strategy.local_rank == 0
+def test_strategy_choice_ddp_cluster_environment(
+    _,
+    env_vars,
+    device_capabilities,
+    strategy,
+    accelerator,
+    devices,
+    accelerator_class,
+    cluster_env_class,
+    local_rank,
+):
+    trainer = Trainer(fast_dev_run=True, strategy=strategy, accelerator=accelerator, devices=devices)
+    assert trainer._accelerator_connector._is_slurm_managing_tasks() == (cluster_env_class is SLURMEnvironment)
+    _assert_trainer(trainer, accelerator=accelerator_class, strategy=DDPStrategy)
+    assert isinstance(trainer.strategy.cluster_environment, cluster_env_class)
+    assert trainer.strategy.cluster_environment.local_rank() == local_rank
+    assert trainer.strategy.local_rank == local_rank
 
 
 @RunIf(min_torch="1.12")
@@ -591,20 +531,17 @@ def test_unsupported_tpu_choice(mock_tpu_acc_avail):
         Trainer(accelerator="tpu", precision=64)
 
     # if user didn't set strategy, AcceleratorConnector will choose the TPUSingleStrategy or TPUSpawnStrategy
-    with pytest.raises(ValueError, match="TPUAccelerator` can only be used with a `SingleTPUStrategy`"):
+    with pytest.raises(ValueError, match=_RE_TPU_STRATEGY_REQUIRED):
         with pytest.warns(UserWarning, match=r"accelerator='tpu', precision=16\)` but native AMP is not supported"):
             Trainer(accelerator="tpu", precision=16, strategy="ddp")
 
-    with pytest.raises(ValueError, match="TPUAccelerator` can only be used with a `SingleTPUStrategy`"):
+    with pytest.raises(ValueError, match=_RE_TPU_STRATEGY_REQUIRED):
         with pytest.warns(UserWarning, match=r"accelerator='tpu', precision=16\)` but apex AMP is not supported"):
             Trainer(accelerator="tpu", precision=16, amp_backend="apex", strategy="single_device")
 
 
 @mock.patch("pytorch_lightning.accelerators.ipu.IPUAccelerator.is_available", return_value=True)
 def test_unsupported_ipu_choice(mock_ipu_acc_avail, monkeypatch):
-    import pytorch_lightning.strategies.ipu as ipu
-    import pytorch_lightning.utilities.imports as imports
-
     monkeypatch.setattr(imports, "_IPU_AVAILABLE", True)
     monkeypatch.setattr(ipu, "_IPU_AVAILABLE", True)
     with pytest.raises(ValueError, match=r"accelerator='ipu', precision='bf16'\)` is not supported"):
@@ -613,22 +550,13 @@ def test_unsupported_ipu_choice(mock_ipu_acc_avail, monkeypatch):
         Trainer(accelerator="ipu", precision=64)
 
 
-@mock.patch("torch.cuda.is_available", return_value=False)
-@mock.patch("pytorch_lightning.utilities.imports._TPU_AVAILABLE", return_value=False)
-@mock.patch("pytorch_lightning.utilities.imports._IPU_AVAILABLE", return_value=False)
-@mock.patch("pytorch_lightning.utilities.imports._HPU_AVAILABLE", return_value=False)
-def test_devices_auto_choice_cpu(
-    is_ipu_available_mock, is_tpu_available_mock, is_gpu_available_mock, is_hpu_available_mock
-):
+def test_devices_auto_choice_cpu(cuda_count_0):
     trainer = Trainer(accelerator="auto", devices="auto")
     assert trainer.num_devices == 1
 
 
-@mock.patch("torch.cuda.is_available", return_value=True)
-@mock.patch("torch.cuda.device_count", return_value=2)
 @RunIf(mps=False)
-def test_devices_auto_choice_gpu(is_gpu_available_mock, device_count_mock):
-
+def test_devices_auto_choice_gpu(fake_cuda):
     trainer = Trainer(accelerator="auto", devices="auto")
     assert isinstance(trainer.accelerator, CUDAAccelerator)
     assert trainer.num_devices == 2
@@ -646,7 +574,7 @@ def test_devices_auto_choice_mps():
     [([torch.device("cpu")], "gpu"), ([torch.device("cuda", i) for i in range(8)], ("tpu"))],
 )
 def test_parallel_devices_in_strategy_confilict_with_accelerator(parallel_devices, accelerator):
-    with pytest.raises(MisconfigurationException, match=r"parallel_devices set through"):
+    with pytest.raises(MisconfigurationException, match=_RE_PARALLEL_DEVICES_CONFLICT):
         Trainer(strategy=DDPStrategy(parallel_devices=parallel_devices), accelerator=accelerator)
 
 
@@ -659,6 +587,14 @@ def test_deterministic_init(deterministic):
         assert os.environ.get("HOROVOD_FUSION_THRESHOLD") == "0"
 
 
+class StubLayerSync(LayerSync):
+    def apply(self, model):
+        return model
+
+    def revert(self, model):
+        return model
+
+
 @pytest.mark.parametrize(
     "sync_batchnorm,plugins,expected",
     [
@@ -666,19 +602,19 @@ def test_deterministic_init(deterministic):
         (True, [], NativeSyncBatchNorm),
         (False, [NativeSyncBatchNorm()], NativeSyncBatchNorm),
         (True, [NativeSyncBatchNorm()], NativeSyncBatchNorm),
-        (False, [Mock(spec=LayerSync)], LayerSync),
+        (False, [StubLayerSync()], LayerSync),
     ],
 )
-def test_sync_batchnorm_set(tmpdir, sync_batchnorm, plugins, expected):
+def test_sync_batchnorm_set(sync_batchnorm, plugins, expected):
     """Test valid combinations of the sync_batchnorm Trainer flag and the plugins list of layer-sync plugins."""
     trainer = Trainer(sync_batchnorm=sync_batchnorm, plugins=plugins, strategy="ddp")
     assert isinstance(trainer._accelerator_connector._layer_sync, expected)
     assert isinstance(trainer.strategy._layer_sync, expected)
 
 
-def test_sync_batchnorm_invalid_choice(tmpdir):
+def test_sync_batchnorm_invalid_choice():
     """Test that a conflicting specification of enabled sync batchnorm and a custom plugin leads to an error."""
-    custom = Mock(spec=LayerSync)
+    custom = StubLayerSync()
     with pytest.raises(
         MisconfigurationException,
         match=r"You set `Trainer\(sync_batchnorm=True\)` and provided a `LayerSync` plugin, but this is not allowed",
@@ -687,7 +623,7 @@ def test_sync_batchnorm_invalid_choice(tmpdir):
 
 
 @RunIf(skip_windows=True)
-def test_sync_batchnorm_set_in_custom_strategy(tmpdir):
+def test_sync_batchnorm_set_in_custom_strategy():
     """Tests if layer_sync is automatically set for custom strategy."""
 
     class CustomParallelStrategy(DDPStrategy):
@@ -721,5 +657,5 @@ def test_plugin_only_one_instance_for_one_type(plugins, expected):
 @pytest.mark.parametrize("accelerator", ("cpu", "gpu", "tpu", "ipu"))
 @pytest.mark.parametrize("devices", ("0", 0, []))
 def test_passing_zero_and_empty_list_to_devices_flag(accelerator, devices):
-    with pytest.raises(MisconfigurationException, match="value is not a valid input using"):
+    with pytest.raises(MisconfigurationException, match=_RE_INVALID_DEVICES_INPUT):
         Trainer(accelerator=accelerator, devices=devices)
@@ -22,10 +22,10 @@ from typing import List
 import pytest
 import torch.distributed
 
-from pytorch_lightning.plugins.environments.lightning_environment import find_free_network_port
 from pytorch_lightning.trainer.connectors.signal_connector import SignalConnector
 from pytorch_lightning.utilities.imports import _IS_WINDOWS
 from tests_pytorch import _PATH_DATASETS
+from tests_pytorch.helpers.runif import _cuda_device_count
 
 
 @pytest.fixture(scope="session")
@@ -156,18 +156,12 @@ def single_process_pg():
     if torch.distributed.is_initialized():
         raise RuntimeError("Can't use `single_process_pg` when the default process group is already initialized.")
 
-    orig_environ = os.environ.copy()
-    os.environ["MASTER_ADDR"] = "localhost"
-    os.environ["MASTER_PORT"] = str(find_free_network_port())
-    os.environ["RANK"] = "0"
-    os.environ["WORLD_SIZE"] = "1"
-    torch.distributed.init_process_group("gloo")
+    # an in-memory store avoids the TCP rendezvous, there are no other processes to connect to
+    torch.distributed.init_process_group("gloo", store=torch.distributed.HashStore(), rank=0, world_size=1)
     try:
         yield
     finally:
         torch.distributed.destroy_process_group()
-        os.environ.clear()
-        os.environ.update(orig_environ)
 
 
 def pytest_collection_modifyitems(items: List[pytest.Function], config: pytest.Config):
@@ -205,11 +199,24 @@ def pytest_collection_modifyitems(items: List[pytest.Function], config: pytest.C
                     items.pop(i)
                     filtered += 1
 
-    if config.option.verbose >= 0 and (filtered or skipped):
+    # deselect the tests that need more CUDA devices than available, rather than setting them up just to skip them
+    cuda_device_count = _cuda_device_count()
+    deselected = []
+    for i, test in reversed(list(enumerate(items))):
+        min_cuda_gpus = max(
+            (marker.kwargs.get("min_cuda_gpus", 0) for marker in test.own_markers if marker.name == "skipif"), default=0
+        )
+        if min_cuda_gpus > cuda_device_count:
+            deselected.append(items.pop(i))
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+
+    if config.option.verbose >= 0 and (filtered or skipped or deselected):
         writer = config.get_terminal_writer()
         writer.write(
             f"\nThe number of tests has been filtered from {initial_size} to {initial_size - filtered} after the"
-            f" filters {conditions}.\n{skipped} tests are marked as unconditional skips.\nIn total, {len(items)} tests"
+            f" filters {conditions}.\n{skipped} tests are marked as unconditional skips.\n{len(deselected)} tests"
+            f" require more than the {cuda_device_count} available CUDA devices.\nIn total, {len(items)} tests"
             " will run.\n",
             flush=True,
             bold=True,
@@ -13,6 +13,7 @@
 # limitations under the License.
 import os
 import sys
+from functools import lru_cache
 from typing import Optional
 
 import pytest
@@ -53,6 +54,39 @@ if _HOROVOD_AVAILABLE:
         pass
 
 
+@lru_cache()
+def _cuda_device_count() -> int:
+    return torch.cuda.device_count()
+
+
+@lru_cache()
+def _torch_version() -> Version:
+    return Version(get_distribution("torch").version)
+
+
+@lru_cache()
+def _python_version() -> Version:
+    return Version(f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
+
+
+@lru_cache()
+def _quantization_available() -> bool:
+    return _TORCH_QUANTIZE_AVAILABLE and "fbgemm" in torch.backends.quantized.supported_engines
+
+
+@lru_cache()
+def _bf16_cuda_available() -> bool:
+    try:
+        return torch.cuda.is_available() and _TORCH_GREATER_EQUAL_1_10 and torch.cuda.is_bf16_supported()
+    except (AssertionError, RuntimeError) as e:
+        # AssertionError: Torch not compiled with CUDA enabled
+        # RuntimeError: Found no NVIDIA driver on your system.
+        is_unrelated = "Found no NVIDIA driver" not in str(e) or "Torch not compiled with CUDA" not in str(e)
+        if is_unrelated:
+            raise e
+        return False
+
+
 class RunIf:
     """RunIf wrapper for simple marking specific cases, fully compatible with pytest.mark::
 
@@ -62,6 +96,9 @@ class RunIf:
         assert arg1 > 0.0
     """
 
+    # the returned marks are immutable, so the same one can be shared by every test with identical requirements
+    @staticmethod
+    @lru_cache(maxsize=None)
     def __new__(
         self,
         *args,
@@ -127,29 +164,25 @@ class RunIf:
         reasons = []
 
         if min_cuda_gpus:
-            conditions.append(torch.cuda.device_count() < min_cuda_gpus)
+            conditions.append(_cuda_device_count() < min_cuda_gpus)
             reasons.append(f"GPUs>={min_cuda_gpus}")
             # used in conftest.py::pytest_collection_modifyitems
-            kwargs["min_cuda_gpus"] = True
+            kwargs["min_cuda_gpus"] = min_cuda_gpus
 
         if min_torch:
-            torch_version = get_distribution("torch").version
-            conditions.append(Version(torch_version) < Version(min_torch))
+            conditions.append(_torch_version() < Version(min_torch))
             reasons.append(f"torch>={min_torch}")
 
         if max_torch:
-            torch_version = get_distribution("torch").version
-            conditions.append(Version(torch_version) >= Version(max_torch))
+            conditions.append(_torch_version() >= Version(max_torch))
             reasons.append(f"torch<{max_torch}")
 
         if min_python:
-            py_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-            conditions.append(Version(py_version) < Version(min_python))
+            conditions.append(_python_version() < Version(min_python))
             reasons.append(f"python>={min_python}")
 
         if quantization:
-            _miss_default = "fbgemm" not in torch.backends.quantized.supported_engines
-            conditions.append(not _TORCH_QUANTIZE_AVAILABLE or _miss_default)
+            conditions.append(not _quantization_available())
             reasons.append("PyTorch quantization")
 
         if amp_apex:
@@ -157,17 +190,7 @@ class RunIf:
             reasons.append("NVIDIA Apex")
 
         if bf16_cuda:
-            try:
-                cond = not (torch.cuda.is_available() and _TORCH_GREATER_EQUAL_1_10 and torch.cuda.is_bf16_supported())
-            except (AssertionError, RuntimeError) as e:
-                # AssertionError: Torch not compiled with CUDA enabled
-                # RuntimeError: Found no NVIDIA driver on your system.
-                is_unrelated = "Found no NVIDIA driver" not in str(e) or "Torch not compiled with CUDA" not in str(e)
-                if is_unrelated:
-                    raise e
-                cond = True
-
-            conditions.append(cond)
+            conditions.append(not _bf16_cuda_available())
             reasons.append("CUDA device bf16")
 
         if skip_windows:
@@ -11,12 +11,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import os
 from datetime import timedelta
 from unittest import mock
 
 import pytest
 import torch
+import torch.distributed
 from torch.nn.parallel import DistributedDataParallel
 
 from pytorch_lightning import LightningModule, Trainer
@@ -26,24 +26,35 @@ from pytorch_lightning.strategies import DDPStrategy
 from pytorch_lightning.trainer.states import TrainerFn
 from tests_pytorch.helpers.runif import RunIf
 
+# with pytest-xdist, keep these tests on one worker so that they share its CUDA context
+pytestmark = pytest.mark.xdist_group("cuda-ddp")
+
+# none of the tests in this file look at logs, checkpoints or the progress output
+_TRAINER_KWARGS = dict(
+    logger=False,
+    enable_checkpointing=False,
+    enable_progress_bar=False,
+    enable_model_summary=False,
+    num_sanity_val_steps=0,
+)
+
 
 class BoringModelGPU(BoringModel):
     def on_train_start(self) -> None:
         # make sure that the model is on GPU when training
         assert self.device == torch.device(f"cuda:{self.trainer.strategy.local_rank}")
-        self.start_cuda_memory = torch.cuda.memory_allocated()
+        self.start_cuda_memory = torch.cuda.memory_allocated(self.device)
 
 
 @RunIf(min_cuda_gpus=2, skip_windows=True, standalone=True)
 def test_ddp_with_2_gpus():
     """Tests if device is set correctly when training and after teardown for DDPStrategy."""
     trainer = Trainer(
+        **_TRAINER_KWARGS,
         accelerator="gpu",
         devices=2,
         strategy="ddp",
         fast_dev_run=True,
-        enable_progress_bar=False,
-        enable_model_summary=False,
     )
     # assert strategy attributes for device setting
     assert isinstance(trainer.strategy, DDPStrategy)
@@ -56,7 +67,7 @@ def test_ddp_with_2_gpus():
 
     # assert after training, model is moved to CPU and memory is deallocated
     assert model.device == torch.device("cpu")
-    cuda_memory = torch.cuda.memory_allocated()
+    cuda_memory = torch.cuda.memory_allocated(trainer.strategy.root_device)
     assert cuda_memory < model.start_cuda_memory
 
 
@@ -74,24 +85,27 @@ class BarrierModel(BoringModel):
 @mock.patch("torch.distributed.barrier")
 def test_ddp_barrier_non_consecutive_device_ids(barrier_mock, tmpdir):
     """Test correct usage of barriers when device ids do not start at 0 or are not consecutive."""
-    model = BoringModel()
     gpus = [1, 3]
     trainer = Trainer(
+        **_TRAINER_KWARGS,
         default_root_dir=tmpdir,
-        max_steps=1,
         accelerator="gpu",
         devices=gpus,
         strategy="ddp",
-        enable_progress_bar=False,
-        enable_model_summary=False,
     )
-    trainer.fit(model)
+
+    def setup_and_barrier(strategy):
+        # the barrier only needs the process group and the device of this rank, no training is required
+        strategy.setup_environment()
+        strategy.barrier("barrier with non-consecutive device ids")
+
+    trainer.strategy.launcher.launch(setup_and_barrier, trainer.strategy, trainer=trainer)
     barrier_mock.assert_any_call(device_ids=[gpus[trainer.local_rank]])
 
 
-@mock.patch.dict(os.environ, {"LOCAL_RANK": "1"})
-def test_incorrect_ddp_script_spawning(tmpdir):
+def test_incorrect_ddp_script_spawning(tmpdir, monkeypatch):
     """Test an error message when user accidentally instructs Lightning to spawn children processes on rank > 0."""
+    monkeypatch.setenv("LOCAL_RANK", "1")
 
     class WronglyImplementedEnvironment(LightningEnvironment):
         @property
@@ -99,67 +113,62 @@ def test_incorrect_ddp_script_spawning(tmpdir):
             # returning false no matter what means Lightning would spawn also on ranks > 0 new processes
             return False
 
-    model = BoringModel()
     trainer = Trainer(
+        **_TRAINER_KWARGS,
         default_root_dir=tmpdir,
         strategy="ddp",
         accelerator="cpu",
         devices=2,
         plugins=[WronglyImplementedEnvironment()],
     )
+    # the check happens when the launcher starts, there is no need to run `fit` up to that point
+    function = mock.Mock()
     with pytest.raises(
         RuntimeError, match="Lightning attempted to launch new distributed processes with `local_rank > 0`."
     ):
-        trainer.fit(model)
+        trainer.strategy.launcher.launch(function, trainer=trainer)
+    function.assert_not_called()
 
 
-@RunIf(skip_windows=True)
-def test_ddp_configure_ddp():
-    """Tests with ddp strategy."""
-    model = BoringModel()
-    ddp_strategy = DDPStrategy()
-    trainer = Trainer(
-        max_epochs=1,
-        strategy=ddp_strategy,
-    )
-    # test wrap the model if fitting
-    trainer.state.fn = TrainerFn.FITTING
+def _connect_and_setup_environment(trainer, model, trainer_fn):
+    """Runs the steps of ``Trainer.fit`` that come before ``Strategy.setup`` without fitting."""
+    trainer.state.fn = trainer_fn
     trainer.strategy.connect(model)
     trainer.lightning_module.trainer = trainer
     trainer.strategy.setup_environment()
-    assert isinstance(trainer.model, LightningModule)
-    trainer.strategy.setup(trainer)
-    # in DDPStrategy configure_ddp(), model wrapped by DistributedDataParallel
-    assert isinstance(trainer.model, DistributedDataParallel)
 
+
+@RunIf(skip_windows=True)
+@pytest.mark.parametrize(
+    ["trainer_fn", "model_class"],
+    [
+        # in DDPStrategy configure_ddp(), model wrapped by DistributedDataParallel if fitting
+        (TrainerFn.FITTING, DistributedDataParallel),
+        # the model is still a LightningModule if TrainerFn is not fitting
+        (TrainerFn.VALIDATING, LightningModule),
+    ],
+)
+def test_ddp_configure_ddp(single_process_pg, trainer_fn, model_class):
+    """Tests with ddp strategy."""
     ddp_strategy = DDPStrategy()
-    trainer = Trainer(
-        max_epochs=1,
-        strategy=ddp_strategy,
-    )
-    # test do not wrap the model if TrainerFn is not fitting
-    trainer.state.fn = TrainerFn.VALIDATING
-    trainer.strategy.connect(model)
-    trainer.lightning_module.trainer = trainer
-    trainer.strategy.setup_environment()
-    trainer.strategy.setup(trainer)
-    # in DDPStrategy configure_ddp(), model are still LightningModule
+    trainer = Trainer(**_TRAINER_KWARGS, max_epochs=1, strategy=ddp_strategy)
+    _connect_and_setup_environment(trainer, BoringModel(), trainer_fn)
     assert isinstance(trainer.model, LightningModule)
+    trainer.strategy.setup(trainer)
+    assert isinstance(trainer.model, model_class)
 
 
 @RunIf(min_cuda_gpus=1)
 @pytest.mark.parametrize(
     "trainer_fn", (TrainerFn.VALIDATING, TrainerFn.TUNING, TrainerFn.TESTING, TrainerFn.PREDICTING)
 )
-def test_ddp_dont_configure_sync_batchnorm(trainer_fn):
+def test_ddp_dont_configure_sync_batchnorm(single_process_pg, trainer_fn):
     model = BoringModelGPU()
-    model.layer = torch.nn.BatchNorm1d(10)
+    # any batch norm layer would be converted, it does not need parameters or buffers
+    model.layer = torch.nn.BatchNorm1d(1, affine=False, track_running_stats=False)
     ddp_strategy = DDPStrategy()
-    trainer = Trainer(accelerator="gpu", devices=1, strategy=ddp_strategy, sync_batchnorm=True)
-    trainer.state.fn = trainer_fn
-    trainer.strategy.connect(model)
-    trainer.lightning_module.trainer = trainer
-    trainer.strategy.setup_environment()
+    trainer = Trainer(**_TRAINER_KWARGS, accelerator="gpu", devices=1, strategy=ddp_strategy, sync_batchnorm=True)
+    _connect_and_setup_environment(trainer, model, trainer_fn)
     assert isinstance(trainer.model, LightningModule)
     trainer.strategy.setup(trainer)
     # because TrainerFn is not FITTING, model is not configured with sync batchnorm
@@ -168,17 +177,18 @@ def test_ddp_dont_configure_sync_batchnorm(trainer_fn):
 
 class CheckOptimizerDeviceModel(BoringModel):
     def configure_optimizers(self):
-        assert all(param.device.type == "cuda" for param in self.parameters())
+        assert next(self.parameters()).device.type == "cuda"
         super().configure_optimizers()
 
 
 @RunIf(min_cuda_gpus=1)
 @pytest.mark.parametrize("strategy", ("ddp", "ddp_spawn"))
-def test_model_parameters_on_device_for_optimizer(strategy):
+def test_model_parameters_on_device_for_optimizer(tmpdir, strategy):
     """Test that the strategy has moved the parameters to the device by the time the optimizer gets created."""
     model = CheckOptimizerDeviceModel()
     trainer = Trainer(
-        default_root_dir=os.getcwd(),
+        **_TRAINER_KWARGS,
+        default_root_dir=tmpdir,
         fast_dev_run=1,
         accelerator="gpu",
         devices=1,
@@ -187,64 +197,66 @@ def test_model_parameters_on_device_for_optimizer(strategy):
     trainer.fit(model)
 
 
-def test_configure_launcher_create_processes_externally():
-    class MyClusterEnvironment(ClusterEnvironment):
-        @property
-        def creates_processes_externally(self):
-            return True
+class StubClusterEnvironment(ClusterEnvironment):
+    """A single process cluster environment whose processes are created outside of Lightning."""
 
-        @property
-        def main_address(self):
-            return ""
+    @property
+    def creates_processes_externally(self):
+        return True
 
-        @property
-        def main_port(self):
-            return 8080
+    @property
+    def main_address(self):
+        return ""
+
+    @property
+    def main_port(self):
+        return 8080
+
+    @staticmethod
+    def detect():
+        return True
 
-        @staticmethod
-        def detect():
-            return True
+    def world_size(self):
+        return 1
 
-        def world_size(self):
-            return 1
+    def set_world_size(self):
+        pass
 
-        def set_world_size(self):
-            pass
+    def global_rank(self):
+        return 0
 
-        def global_rank(self):
-            return 0
+    def set_global_rank(self):
+        pass
 
-        def set_global_rank(self):
-            pass
+    def local_rank(self):
+        return 0
 
-        def local_rank(self):
-            return 0
+    def node_rank(self):
+        return 0
 
-        def node_rank(self):
-            return 0
 
-    ddp_strategy = DDPStrategy(cluster_environment=MyClusterEnvironment())
+def test_configure_launcher_create_processes_externally():
+    ddp_strategy = DDPStrategy(cluster_environment=StubClusterEnvironment())
     assert ddp_strategy.launcher is None
     ddp_strategy._configure_launcher()
     assert ddp_strategy.launcher is None
 
 
+@pytest.fixture
+def mock_init_process_group():
+    """Skips the process group initialization in tests that never communicate across processes."""
+    with mock.patch("torch.distributed.init_process_group") as init_process_group_mock:
+        yield init_process_group_mock
+
+
 @RunIf(min_cuda_gpus=1)
-@mock.patch("torch.distributed.init_process_group")
 def test_ddp_strategy_set_timeout(mock_init_process_group):
     """Tests with ddp strategy."""
     test_timedelta = timedelta(seconds=30)
-    model = BoringModel()
     ddp_strategy = DDPStrategy(timeout=test_timedelta)
-    trainer = Trainer(
-        max_epochs=1,
-        strategy=ddp_strategy,
-    )
+    trainer = Trainer(**_TRAINER_KWARGS, max_epochs=1, strategy=ddp_strategy)
     # test wrap the model if fitting
-    trainer.state.fn = TrainerFn.FITTING
-    trainer.strategy.connect(model)
-    trainer.lightning_module.trainer = trainer
-    trainer.strategy.setup_environment()
+    _connect_and_setup_environment(trainer, BoringModel(), TrainerFn.FITTING)
 
     process_group_backend = trainer.strategy._get_process_group_backend()
     global_rank = trainer.strategy.cluster_environment.global_rank()